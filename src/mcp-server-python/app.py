@@ -1,22 +1,153 @@
 import os
+import json
+import asyncio
 import logging
+import contextlib
+import anyio
+from cachetools import TTLCache
 from mcp.server.fastmcp import FastMCP
-from bs4 import BeautifulSoup
-import requests
+from lxml import etree
+import httpx
 from starlette.applications import Starlette
 from starlette.routing import Mount
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 import uvicorn
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Titles sit near the top of the page, so stop reading after this much once any are found
+TITLE_SCAN_BYTES = 200_000
+# Upper bound on how much of the page is handed to the parser
+MAX_PARSE_BYTES = 512_000
+
+# Number of article titles returned by the tool
+MAX_TITLES = 5
+
+# Only these tags are handed back to Python by the pull parser; everything else stays in C
+TITLE_TAGS = ("h1", "h2", "h3")
+CONTAINER_TAGS = ("article", "div")
+
+# Length of the page text returned when no titles are found
+MAX_TEXT_CHARS = 1000
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Connection pool for concurrent tool calls; connect errors are retried by the transport
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+MAX_RETRIES = 2
+# Upstream statuses retried by fetch_titles, after RETRY_BACKOFF seconds doubling per attempt
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BACKOFF = 0.2
+
+# Shared async HTTP client, opened and closed by the application lifespan
+HTTP_CLIENT: httpx.AsyncClient | None = None
+
+CATEGORY_URLS = {
+    "ai": "https://techcrunch.com/tag/ai/",
+    "startup": "https://techcrunch.com/tag/startup/",
+    "security": "https://techcrunch.com/tag/security/",
+    "venture": "https://techcrunch.com/tag/venture/",
+    "latest": "https://techcrunch.com/",
+}
+
+# Formatted tool results per category; landing pages only change every few minutes
+NEWS_CACHE = TTLCache(maxsize=16, ttl=120)
+# Upstream failures per category, kept briefly so an outage isn't retried on every call
+ERROR_CACHE = TTLCache(maxsize=16, ttl=15)
+CATEGORY_LOCKS = {cat: asyncio.Lock() for cat in CATEGORY_URLS}
+
 # Create FastMCP server (stateless for production deployment)
 mcp = FastMCP("TechCrunch News Server", stateless_http=True)
 
+def article_title(heading) -> str | None:
+    """Return the text of a title heading inside a post/article container, if it is one"""
+    if "title" not in heading.get("class", "").lower():
+        return None
+    for container in heading.iterancestors(*CONTAINER_TAGS):
+        cls = container.get("class", "").lower()
+        if "post" in cls or "article" in cls:
+            title = " ".join("".join(heading.itertext()).split())
+            return title if len(title) > 10 else None  # Filter out very short titles
+    return None
+
+def page_text(root) -> str:
+    """Return the start of the visible body text, a little past MAX_TEXT_CHARS"""
+    body = root.find("body")
+    if body is None:
+        return ""
+    etree.strip_elements(body, "script", "style", with_tail=False)
+    parts = []
+    size = 0
+    for text in body.itertext():
+        text = " ".join(text.split())
+        if text:
+            parts.append(text)
+            size += len(text) + 1
+            if size > MAX_TEXT_CHARS:
+                break
+    return " ".join(parts)
+
+def parse_stream(next_chunk, encoding: str) -> tuple[list[str], str]:
+    """Parse chunks pulled from the event loop, stopping once enough titles are found
+
+    Runs in a worker thread so parsing never blocks the event loop. next_chunk is an
+    async callable returning the next body chunk, or b"" at the end of the stream.
+    Returns the titles, plus the visible page text when no titles were found.
+    """
+    # Take the charset from Content-Type rather than sniffing the body; TechCrunch serves UTF-8
+    try:
+        parser = etree.HTMLPullParser(events=("end",), tag=TITLE_TAGS, encoding=encoding)
+    except LookupError:
+        # A charset label libxml2 doesn't know shouldn't fail the call; decode as UTF-8 instead
+        parser = etree.HTMLPullParser(events=("end",), tag=TITLE_TAGS, encoding="utf-8")
+    feed = parser.feed
+    read_events = parser.read_events
+    titles = []
+    received = 0
+    while chunk := anyio.from_thread.run(next_chunk):
+        feed(chunk)
+        for _, heading in read_events():
+            title = article_title(heading)
+            if title:
+                titles.append(title)
+        received += len(chunk)
+        if len(titles) >= MAX_TITLES:
+            return titles[:MAX_TITLES], ""
+        if received >= MAX_PARSE_BYTES or (titles and received >= TITLE_SCAN_BYTES):
+            break
+    if titles or not received:
+        return titles, ""
+    return titles, page_text(parser.close())
+
+async def read_titles(response: httpx.Response) -> tuple[list[str], str]:
+    """Parse a streamed response on a worker thread while it downloads"""
+    chunks = response.aiter_bytes(8192)
+
+    async def next_chunk():
+        return await anext(chunks, b"")
+
+    # The parser stays on one thread for its whole life and pulls chunks back from the loop
+    return await anyio.to_thread.run_sync(parse_stream, next_chunk, response.charset_encoding or "utf-8")
+
+async def fetch_titles(url: str) -> tuple[httpx.Response, list[str], str]:
+    """Stream a page into the title parser, retrying transient 5xx responses with backoff"""
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        async with HTTP_CLIENT.stream("GET", url) as response:
+            if response.is_success:
+                # Parse while the page downloads; leaving the block drops the rest of it
+                return response, *await read_titles(response)
+        if response.status_code not in RETRY_STATUSES:
+            break
+    return response, [], ""
+
 @mcp.tool()
-def fetch_from_techcrunch(category: str = "latest") -> str:
+async def fetch_from_techcrunch(category: str = "latest") -> str:
     """
     Fetch the latest news from TechCrunch for a given category.
     
@@ -26,72 +157,87 @@ def fetch_from_techcrunch(category: str = "latest") -> str:
     Returns:
         Latest news content from TechCrunch
     """
-    allowed = {"ai", "startup", "security", "venture", "latest"}
     cat = category.lower()
 
-    if cat not in allowed:
-        cat = "latest"
-        logger.warning(f"Invalid category '{category}', defaulting to 'latest'")
+    url = CATEGORY_URLS.get(cat)
 
-    url = f"https://techcrunch.com/tag/{cat}/" if cat != "latest" else "https://techcrunch.com/"
+    if url is None:
+        cat = "latest"
+        url = CATEGORY_URLS[cat]
+        logger.warning("Invalid category '%s', defaulting to 'latest'", category)
     
-    logger.info(f"Fetching TechCrunch news from category: {cat}")
+    async with CATEGORY_LOCKS[cat]:
+        # Concurrent calls for the same category wait here and share one fetch
+        if cat in NEWS_CACHE:
+            logger.info("Serving cached TechCrunch news for category: %s", cat)
+            return NEWS_CACHE[cat]
+        if cat in ERROR_CACHE:
+            logger.info("Serving cached TechCrunch error for category: %s", cat)
+            return ERROR_CACHE[cat]
 
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        logger.info("Fetching TechCrunch news from category: %s", cat)
+
+        try:
+            response, articles, text = await fetch_titles(url)
         
-        if response.ok:
-            try:
-                soup = BeautifulSoup(response.text, "html.parser")
-                
-                # Extract article titles and summaries more intelligently
-                articles = []
-                for article in soup.find_all(['article', 'div'], class_=lambda x: x and ('post' in x.lower() or 'article' in x.lower()))[:5]:
-                    title_elem = article.find(['h1', 'h2', 'h3'], class_=lambda x: x and 'title' in x.lower())
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                        if title and len(title) > 10:  # Filter out very short titles
-                            articles.append(title)
-                
+            if response.is_success:
                 if articles:
-                    result = f"Latest TechCrunch {cat} news:\n\n" + "\n".join([f"• {article}" for article in articles])
-                    return result[:2000] + ("..." if len(result) > 2000 else "")
+                    body = "• " + "\n• ".join(articles)
+                    result = f"Latest TechCrunch {cat} news:\n\n{body}"
+                    if len(result) > 2000:
+                        result = result[:2000] + "..."
                 else:
                     # Fallback to general text extraction
-                    text = soup.get_text(separator=' ', strip=True)
-                    return f"TechCrunch {cat} news content:\n" + text[:1000] + ("..." if len(text) > 1000 else "")
-                    
-            except ImportError:
-                return f"TechCrunch {cat} content:\n" + response.text[:1000] + ("..." if len(response.text) > 1000 else "")
-        else:
-            return f"Failed to fetch news from TechCrunch. HTTP Status: {response.status_code}"
+                    if len(text) > MAX_TEXT_CHARS:
+                        text = text[:MAX_TEXT_CHARS] + "..."
+                    result = f"TechCrunch {cat} news content:\n{text}"
+                NEWS_CACHE[cat] = result
+                return result
+            else:
+                error = f"Failed to fetch news from TechCrunch. HTTP Status: {response.status_code}"
             
-    except requests.exceptions.Timeout:
-        return "Error: Request timeout while fetching TechCrunch news"
-    except requests.exceptions.RequestException as e:
-        return f"Error fetching TechCrunch news: {str(e)}"
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        return f"Unexpected error while fetching news: {str(e)}"
+        except httpx.TimeoutException:
+            error = "Error: Request timeout while fetching TechCrunch news"
+        except httpx.HTTPError as e:
+            error = f"Error fetching TechCrunch news: {str(e)}"
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            return f"Unexpected error while fetching news: {str(e)}"
+
+        ERROR_CACHE[cat] = error
+        return error
+
+# Health check payload never changes, so serialize it once at import time
+HEALTH_BODY = json.dumps({
+    "service": "TechCrunch News MCP Server",
+    "status": "healthy",
+    "transport": "streamable-http",
+    "mcp_endpoint": "/mcp"
+}, separators=(",", ":")).encode()
 
 # Create ASGI application for production deployment
 async def root_handler(request):
     """Health check endpoint"""
-    return JSONResponse({
-        "service": "TechCrunch News MCP Server",
-        "status": "healthy",
-        "transport": "streamable-http",
-        "mcp_endpoint": "/mcp"
-    })
+    return Response(HEALTH_BODY, media_type="application/json")
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Open the shared HTTP client and run the MCP session manager"""
+    global HTTP_CLIENT
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS, retries=MAX_RETRIES)
+    async with httpx.AsyncClient(transport=transport, timeout=10, headers=HTTP_HEADERS, follow_redirects=True) as client:
+        HTTP_CLIENT = client
+        # Mounted apps don't get their own lifespan, so start the MCP session manager here
+        async with mcp.session_manager.run():
+            yield
+    HTTP_CLIENT = None
 
 # Create Starlette app with MCP server mounted at /mcp
 app = Starlette(
     routes=[
         Mount("/mcp", mcp.streamable_http_app()),
-    ]
+    ],
+    lifespan=lifespan,
 )
 
 # Add root health check
@@ -105,5 +251,15 @@ if __name__ == "__main__":
     logger.info("📍 MCP endpoint available at /mcp")
     logger.info("🏥 Health check available at /")
     
-    # Run with uvicorn for production
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    # Run with uvicorn for production; "auto" picks uvloop where it is installed (not on Windows),
+    # and multiple workers need the app as an import string
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        log_level="info",
+        access_log=False,
+    )
\ No newline at end of file